@@ -0,0 +1,227 @@
+"""Auditoria em lote de históricos de PBIT, sem a interface do Streamlit.
+
+Cada diretório informado é tratado como o histórico de um relatório: os
+.pbit são ordenados pelo nome e comparados em pares consecutivos. Arquivos
+soltos formam um histórico único, na ordem em que foram passados.
+
+    python auditoria.py builds/vendas builds/financeiro -o auditoria.json
+
+No JSON, "medidas_afetadas" de cada entrada de "impact" é a lista das
+medidas atingidas (a máscara interna do report é decodificada na saída).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from cache_modelos import CacheModelos
+from comparacao import comparar_modelos
+from dependencias import medidas_da_mascara
+from exportacao import exportar_excel, exportar_parquet, exportar_parquet_impacto
+from modelo import carregar_data_model
+
+
+def _carregar(caminho, diretorio_cache=None):
+    if diretorio_cache:
+        return CacheModelos(diretorio_cache).obter(caminho)
+    return carregar_data_model(caminho)
+
+
+def montar_historicos(caminhos):
+    """Lista de (origem, [arquivos .pbit em ordem])."""
+    historicos, soltos = [], []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            arquivos = sorted(
+                os.path.join(caminho, nome) for nome in os.listdir(caminho)
+                if nome.lower().endswith(".pbit")
+            )
+            historicos.append((caminho, arquivos))
+        else:
+            soltos.append(caminho)
+    if soltos:
+        historicos.append(("arquivos", soltos))
+    return historicos
+
+
+class _Progresso:
+    def __init__(self, etapa, total, unidade="arq", saida=sys.stderr):
+        self.etapa, self.total, self.unidade, self.saida = etapa, total, unidade, saida
+        self.feitos, self.bytes = 0, 0
+        self.inicio = time.perf_counter()
+
+    def avancar(self, tamanho=0):
+        self.feitos += 1
+        self.bytes += tamanho
+        if self.saida is None:
+            return
+        print(f"\r[{self.etapa}] {self.feitos}/{self.total} {self.resumo()}",
+              end="", file=self.saida, flush=True)
+
+    def resumo(self):
+        decorrido = max(time.perf_counter() - self.inicio, 1e-9)
+        texto = f"{self.feitos / decorrido:.1f} {self.unidade}/s"
+        if self.bytes:
+            texto += f", {self.bytes / decorrido / 1e6:.1f} MB/s"
+        return texto
+
+    def concluir(self):
+        if self.total and self.saida is not None:
+            print(file=self.saida)
+        return {
+            "itens": self.feitos,
+            "bytes": self.bytes,
+            "segundos": round(time.perf_counter() - self.inicio, 3),
+        }
+
+
+def auditar(caminhos, processos=None, diretorio_cache=None):
+    historicos = montar_historicos(caminhos)
+    # Ordem de carga segue os históricos, para que os pares fiquem prontos cedo
+    arquivos = list(dict.fromkeys(a for _, lista in historicos for a in lista))
+    pares = list(dict.fromkeys((a, b) for _, lista in historicos for a, b in zip(lista, lista[1:])))
+    pares_por_arquivo, pendentes = {}, {}
+    for par in pares:
+        for arquivo in par:
+            pares_por_arquivo.setdefault(arquivo, []).append(par)
+            pendentes[arquivo] = pendentes.get(arquivo, 0) + 1
+    modelos, reports, erros = {}, {}, {}
+
+    # Cada par é comparado aqui mesmo, assim que os dois modelos chegam: com os
+    # hashes da árvore o diff custa bem menos que serializar os dois modelos
+    # de volta para um worker. Um modelo sai da memória quando o último par
+    # que o usa termina, e só há `em_voo` cargas adiantadas por vez, então o
+    # pico fica em alguns modelos, não no histórico inteiro.
+    progresso = _Progresso("carga", len(arquivos))
+    # As comparações acontecem entre as cargas; só a carga mostra progresso
+    progresso_pares = _Progresso("comparação", len(pares), "pares", saida=None)
+    chegados = set()
+
+    def liberar(arquivo):
+        pendentes[arquivo] -= 1
+        if not pendentes[arquivo]:
+            del modelos[arquivo]
+
+    def comparar_prontos(arquivo):
+        # Cada par roda uma vez, quando chega o segundo dos seus arquivos; se
+        # algum falhou na carga, o par fica de fora (o erro da carga basta)
+        chegados.add(arquivo)
+        for anterior, atual in pares_por_arquivo.get(arquivo, ()):
+            if anterior not in chegados or atual not in chegados:
+                continue
+            if anterior in modelos and atual in modelos:
+                try:
+                    reports[anterior, atual] = comparar_modelos(modelos[anterior], modelos[atual])
+                except Exception as e:
+                    erros[f"{anterior} -> {atual}"] = f"{type(e).__name__}: {e}"
+                progresso_pares.avancar()
+            for usado in (anterior, atual):
+                if usado in modelos:
+                    liberar(usado)
+
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        em_voo = 2 * (processos or os.cpu_count() or 1)
+        fila = iter(arquivos)
+        futuros = {}
+        while True:
+            for arquivo in fila:
+                futuros[pool.submit(_carregar, arquivo, diretorio_cache)] = arquivo
+                if len(futuros) >= em_voo:
+                    break
+            if not futuros:
+                break
+            feitos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+            for futuro in feitos:
+                arquivo = futuros.pop(futuro)
+                tamanho = 0
+                try:
+                    modelo = futuro.result()
+                    tamanho = os.path.getsize(arquivo)
+                    if pendentes.get(arquivo):
+                        modelos[arquivo] = modelo
+                except Exception as e:
+                    erros[arquivo] = f"{type(e).__name__}: {e}"
+                progresso.avancar(tamanho)
+                comparar_prontos(arquivo)
+        estat_carga = progresso.concluir()
+    estat_comparacao = progresso_pares.concluir()
+
+    return {
+        "historicos": [
+            {
+                "origem": origem,
+                "comparacoes": [
+                    {"anterior": a, "atual": b, "report": reports[a, b]}
+                    for a, b in zip(lista, lista[1:]) if (a, b) in reports
+                ],
+            }
+            for origem, lista in historicos
+        ],
+        "erros": erros,
+        "estatisticas": {"carga": estat_carga, "comparacao": estat_comparacao},
+    }
+
+
+def _report_json(report):
+    base = report.get("impact_medidas", [])
+    saida = {chave: valor for chave, valor in report.items() if chave != "impact_medidas"}
+    saida["impact"] = [
+        dict(imp, medidas_afetadas=list(medidas_da_mascara(base, imp["medidas_afetadas"])))
+        for imp in report.get("impact", [])
+    ]
+    return saida
+
+
+def _resultado_json(resultado):
+    return dict(resultado, historicos=[
+        dict(historico, comparacoes=[dict(c, report=_report_json(c["report"])) for c in historico["comparacoes"]])
+        for historico in resultado["historicos"]
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara históricos de PBIT em lote.")
+    parser.add_argument("caminhos", nargs="+", help="diretórios (um histórico cada) ou arquivos .pbit")
+    parser.add_argument("-o", "--saida", default="-", help="arquivo JSON do relatório ('-' para stdout)")
+    parser.add_argument("-j", "--processos", type=int, default=None, help="tamanho do pool de processos")
+    parser.add_argument("--cache", metavar="DIR", help="reaproveita o cache de modelos em disco")
+    parser.add_argument("--excel", metavar="ARQUIVO", help="exporta as alterações para .xlsx")
+    parser.add_argument("--parquet", metavar="ARQUIVO", help="exporta as alterações para .parquet (o impacto vai em ARQUIVO_impacto.parquet)")
+    args = parser.parse_args(argv)
+
+    resultado = auditar(args.caminhos, args.processos, args.cache)
+
+    carga = resultado["estatisticas"]["carga"]
+    segundos = max(carga["segundos"], 1e-9)
+    print(
+        f"{carga['itens']} arquivos ({carga['bytes'] / 1e6:.1f} MB) em {carga['segundos']:.1f}s: "
+        f"{carga['itens'] / segundos:.1f} arq/s, {carga['bytes'] / segundos / 1e6:.1f} MB/s; "
+        f"{resultado['estatisticas']['comparacao']['itens']} comparações, "
+        f"{len(resultado['erros'])} erros",
+        file=sys.stderr,
+    )
+
+    if args.saida == "-":
+        json.dump(_resultado_json(resultado), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(_resultado_json(resultado), f, ensure_ascii=False, indent=2)
+
+    comparacoes = [
+        (c["anterior"], c["atual"], c["report"])
+        for historico in resultado["historicos"] for c in historico["comparacoes"]
+    ]
+    if args.excel:
+        exportar_excel(args.excel, comparacoes)
+    if args.parquet:
+        exportar_parquet(args.parquet, comparacoes)
+        raiz, extensao = os.path.splitext(args.parquet)
+        exportar_parquet_impacto(f"{raiz}_impacto{extensao or '.parquet'}", comparacoes)
+    return 1 if resultado["erros"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Benchmarks de carga, comparação e montagem do relatório.
+
+Para cada tamanho de modelo gera um par de PBITs sintéticos e mede tempo
+de parede (melhor e mediana de N repetições), pico de memória (tracemalloc,
+numa execução à parte para não distorcer o tempo) e vazão. O resultado vai
+para um JSON, para comparar execuções.
+
+    python -m benchmarks.benchmark --tamanhos 50x20x10 500x20x10 -o bench.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+from benchmarks.gerador_pbit import gerar_versoes
+from comparacao import comparar_modelos
+from modelo import carregar_data_model
+from relatorio import montar_dataframe
+
+TAMANHOS_PADRAO = ["50x20x10", "200x20x10", "1000x20x10"]
+
+
+def _medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, {
+        "melhor_s": round(min(tempos), 6),
+        "mediana_s": round(statistics.median(tempos), 6),
+        "pico_memoria_mb": round(pico / 1e6, 3),
+    }
+
+
+def _tamanho_descomprimido(caminho):
+    with zipfile.ZipFile(caminho) as z:
+        return z.getinfo("DataModelSchema").file_size
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(tamanho, repeticoes=3, mutacao=1.0, tamanho_expressao=200):
+    tabelas, colunas, medidas = (int(x) for x in tamanho.split("x"))
+    with tempfile.TemporaryDirectory() as diretorio:
+        anterior, atual = gerar_versoes(
+            diretorio, 2, mutacao, tabelas=tabelas, colunas=colunas, medidas=medidas,
+            tamanho_expressao=tamanho_expressao,
+        )
+        bytes_zip = os.path.getsize(anterior)
+        bytes_schema = _tamanho_descomprimido(anterior)
+        objetos = tabelas * (colunas + medidas)
+        resultado = {
+            "tamanho": tamanho,
+            "tabelas": tabelas,
+            "colunas_por_tabela": colunas,
+            "medidas_por_tabela": medidas,
+            "mutacao_percentual": mutacao,
+            "bytes_pbit": bytes_zip,
+            "bytes_data_model_schema": bytes_schema,
+            "etapas": {},
+        }
+
+        for nome, streaming in (("carga_streaming", True), ("carga_completa", False)):
+            old_model, medicao = _medir(lambda: carregar_data_model(anterior, streaming=streaming), repeticoes)
+            medicao["mb_por_s"] = round(bytes_schema / 1e6 / medicao["melhor_s"], 3)
+            medicao["objetos_por_s"] = round(objetos / medicao["melhor_s"], 1)
+            resultado["etapas"][nome] = medicao
+        new_model = carregar_data_model(atual)
+
+        report, medicao = _medir(lambda: comparar_modelos(old_model, new_model), repeticoes)
+        medicao["objetos_por_s"] = round(objetos / medicao["melhor_s"], 1)
+        resultado["etapas"]["comparacao"] = medicao
+
+        df, medicao = _medir(lambda: montar_dataframe(report), repeticoes)
+        medicao["linhas_por_s"] = round(len(df) / medicao["melhor_s"], 1) if len(df) else None
+        resultado["etapas"]["relatorio"] = medicao
+        # impact_medidas é a base das máscaras de impacto, não uma contagem
+        resultado["alteracoes"] = {
+            chave: len(valor) for chave, valor in report.items() if chave != "impact_medidas"
+        }
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de carga/comparação de PBIT.")
+    parser.add_argument("--tamanhos", nargs="+", default=TAMANHOS_PADRAO,
+                        help="TABELASxCOLUNASxMEDIDAS (por tabela)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--mutacao", type=float, default=1.0, help="%% de objetos alterados")
+    parser.add_argument("--tamanho-expressao", type=int, default=200)
+    parser.add_argument("-o", "--saida", default="bench_resultados.json")
+    args = parser.parse_args(argv)
+
+    execucoes = []
+    for tamanho in args.tamanhos:
+        resultado = executar(tamanho, args.repeticoes, args.mutacao, args.tamanho_expressao)
+        execucoes.append(resultado)
+        etapas = resultado["etapas"]
+        print(
+            f"{tamanho:>14}  {resultado['bytes_data_model_schema'] / 1e6:8.1f} MB  "
+            + "  ".join(f"{nome} {m['melhor_s']:.3f}s/{m['pico_memoria_mb']:.1f}MB" for nome, m in etapas.items()),
+            file=sys.stderr,
+        )
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump({
+            "data": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": _commit_atual(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "repeticoes": args.repeticoes,
+            "execucoes": execucoes,
+        }, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Gerador de PBIT sintéticos para os benchmarks.
+
+Os arquivos têm um DataModelSchema válido (UTF-16, como os do Power BI
+Desktop) com quantidade configurável de tabelas, colunas, medidas e tamanho
+de expressões DAX. `mutar` cria a versão seguinte de um modelo alterando uma
+porcentagem controlada dos objetos.
+
+    python -m benchmarks.gerador_pbit saida/ --tabelas 200 --versoes 5 --mutacao 2
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import zipfile
+
+TIPOS = ["int64", "double", "string", "dateTime", "boolean", "decimal"]
+FUNCOES = ["SUM", "AVERAGE", "MIN", "MAX", "DISTINCTCOUNT"]
+
+
+def _expressao(rng, tabela, colunas, medidas, tamanho):
+    """DAX com cerca de `tamanho` caracteres, referenciando colunas e medidas."""
+    partes = []
+    while sum(len(p) for p in partes) < tamanho:
+        if medidas and rng.random() < 0.3:
+            partes.append(f"[{rng.choice(medidas)}]")
+        else:
+            partes.append(f"{rng.choice(FUNCOES)}('{tabela}'[{rng.choice(colunas)}])")
+    corpo = "\n    + ".join(partes)
+    return f"CALCULATE(\n    {corpo},\n    ALL('{tabela}')\n)"
+
+
+def gerar_modelo(tabelas=50, colunas=20, medidas=10, tamanho_expressao=200, semente=0):
+    """Documento TMSL (dict) no formato do DataModelSchema."""
+    rng = random.Random(semente)
+    lista = []
+    existentes = []
+    for t in range(tabelas):
+        nome = f"Tabela {t:05d}"
+        nomes_colunas = [f"Coluna {c:03d}" for c in range(colunas)]
+        cols = [
+            {
+                "name": c,
+                "dataType": rng.choice(TIPOS),
+                "sourceColumn": c.replace(" ", "_").lower(),
+                "description": f"Descrição de {c}",
+                "annotations": [{"name": "SummarizationSetBy", "value": "Automatic"}],
+            }
+            for c in nomes_colunas
+        ]
+        meds = []
+        for m in range(medidas):
+            nome_medida = f"Medida {t:05d}_{m:03d}"
+            meds.append({
+                "name": nome_medida,
+                "expression": _expressao(rng, nome, nomes_colunas, existentes[-50:], tamanho_expressao),
+                "formatString": "0.00",
+            })
+            existentes.append(nome_medida)
+        lista.append({
+            "name": nome,
+            "lineageTag": f"{semente:08x}-{t:08x}",
+            "columns": cols,
+            "measures": meds,
+            "partitions": [{
+                "name": f"{nome}-particao",
+                "mode": "import",
+                "source": {"type": "m", "expression": f'let\n    Fonte = Sql.Database("srv", "db"),\n    T = Fonte{{[Name="{nome}"]}}[Data]\nin\n    T'},
+            }],
+        })
+    return {
+        "name": "SemanticModel",
+        "compatibilityLevel": 1550,
+        "model": {
+            "culture": "pt-BR",
+            "dataAccessOptions": {"legacyRedirects": True, "returnErrorValuesAsNull": True},
+            "defaultPowerBIDataSourceVersion": "powerBI_V3",
+            "tables": lista,
+            "relationships": [],
+            "annotations": [{"name": "PBIDesktopVersion", "value": "2.130"}],
+        },
+    }
+
+
+def mutar(documento, percentual=1.0, semente=1):
+    """Cópia do documento com `percentual`% dos objetos alterados.
+
+    As mutações se dividem entre mudança de DAX, de descrição e de tipo,
+    renomeação de medidas, remoção e adição de colunas.
+    """
+    rng = random.Random(semente)
+    novo = copy.deepcopy(documento)
+    tabelas = novo["model"]["tables"]
+    objetos = [("coluna", t, c) for t in tabelas for c in t["columns"]]
+    objetos += [("medida", t, m) for t in tabelas for m in t["measures"]]
+    quantidade = round(len(objetos) * percentual / 100)
+    for tipo, tabela, item in rng.sample(objetos, min(quantidade, len(objetos))):
+        sorteio = rng.random()
+        if tipo == "medida":
+            if sorteio < 0.5:
+                item["expression"] += f"\n    + {rng.randint(1, 100)}"
+            elif sorteio < 0.7:
+                item["description"] = f"Revisada {rng.randint(0, 9999)}"
+            elif sorteio < 0.9:
+                item["name"] += " (renomeada)"
+            else:
+                tabela["measures"].remove(item)
+        else:
+            if sorteio < 0.4:
+                item["dataType"] = rng.choice([t for t in TIPOS if t != item["dataType"]])
+            elif sorteio < 0.7:
+                item["description"] = f"Revisada {rng.randint(0, 9999)}"
+            elif sorteio < 0.85:
+                tabela["columns"].remove(item)
+            else:
+                tabela["columns"].append(dict(item, name=item["name"] + " nova",
+                                              sourceColumn=item["sourceColumn"] + "_nova"))
+    return novo
+
+
+def gravar_pbit(documento, caminho):
+    with zipfile.ZipFile(caminho, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("Version", "1.28".encode("utf-16-le"))
+        z.writestr("[Content_Types].xml", '<?xml version="1.0" encoding="utf-8"?><Types/>')
+        z.writestr("DataModelSchema", b"\xff\xfe" + json.dumps(documento, indent=2).encode("utf-16-le"))
+    return caminho
+
+
+def gerar_versoes(diretorio, versoes=2, percentual=1.0, semente=0, **tamanho):
+    """Grava `versoes` PBITs consecutivos em `diretorio` e devolve os caminhos."""
+    os.makedirs(diretorio, exist_ok=True)
+    documento = gerar_modelo(semente=semente, **tamanho)
+    caminhos = []
+    for v in range(versoes):
+        if v:
+            documento = mutar(documento, percentual, semente + v)
+        caminhos.append(gravar_pbit(documento, os.path.join(diretorio, f"versao_{v:03d}.pbit")))
+    return caminhos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera PBITs sintéticos.")
+    parser.add_argument("diretorio")
+    parser.add_argument("--tabelas", type=int, default=50)
+    parser.add_argument("--colunas", type=int, default=20)
+    parser.add_argument("--medidas", type=int, default=10)
+    parser.add_argument("--tamanho-expressao", type=int, default=200)
+    parser.add_argument("--versoes", type=int, default=2)
+    parser.add_argument("--mutacao", type=float, default=1.0, help="%% de objetos alterados por versão")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args(argv)
+    for caminho in gerar_versoes(
+        args.diretorio, args.versoes, args.mutacao, args.semente,
+        tabelas=args.tabelas, colunas=args.colunas, medidas=args.medidas,
+        tamanho_expressao=args.tamanho_expressao,
+    ):
+        print(caminho)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+
+from modelo import carregar_data_model
+
+# -----------------------------
+# Cache de modelos já carregados
+# -----------------------------
+# A chave é o SHA-256 dos bytes do PBIT: o mesmo arquivo, enviado de novo ou
+# comparado contra vários candidatos, é carregado uma vez só. Há dois níveis:
+#   - memória: modelos em ordem LRU, até MAX_BYTES_MEMORIA estimados. A
+#     estimativa é o tamanho do JSON compacto (o mesmo gravado em disco)
+#     vezes FATOR_MEMORIA, já que o objeto Python ocupa cerca de 2,8x o JSON;
+#   - disco: o modelo compacto em JSON+gzip, com limite total de bytes e
+#     despejo pelo acesso mais antigo (mtime, atualizado a cada acerto).
+# FORMATO entra no nome do arquivo; mude-o sempre que o modelo compacto mudar
+# para que entradas antigas não sejam reaproveitadas.
+
+FORMATO = 5
+MAX_BYTES_MEMORIA = 64 * 1024 * 1024
+FATOR_MEMORIA = 3  # bytes em memória por byte de JSON compacto (medido ~2,8)
+MAX_BYTES_DISCO = 512 * 1024 * 1024
+DIRETORIO_PADRAO = os.environ.get(
+    "PBIT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "versionamento_pbit")
+)
+
+_BLOCO_HASH = 1 << 20
+
+
+def hash_arquivo(arquivo):
+    """SHA-256 de um caminho ou objeto de arquivo (a posição é restaurada)."""
+    h = hashlib.sha256()
+    if isinstance(arquivo, (str, os.PathLike)):
+        with open(arquivo, "rb") as f:
+            for bloco in iter(lambda: f.read(_BLOCO_HASH), b""):
+                h.update(bloco)
+    else:
+        posicao = arquivo.tell()
+        arquivo.seek(0)
+        for bloco in iter(lambda: arquivo.read(_BLOCO_HASH), b""):
+            h.update(bloco)
+        arquivo.seek(posicao)
+    return h.hexdigest()
+
+
+class CacheModelos:
+    def __init__(self, diretorio=DIRETORIO_PADRAO, max_bytes_disco=MAX_BYTES_DISCO,
+                 max_bytes_memoria=MAX_BYTES_MEMORIA):
+        self.diretorio = diretorio
+        self.max_bytes_disco = max_bytes_disco
+        self.max_bytes_memoria = max_bytes_memoria
+        self._memoria = OrderedDict()  # chave → (modelo, tamanho estimado)
+        self._bytes_memoria = 0
+        self._lock = threading.Lock()
+        self.estatisticas = {"acertos_memoria": 0, "acertos_disco": 0, "faltas": 0}
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}-v{FORMATO}.json.gz")
+
+    def _guardar_memoria(self, chave, modelo, tamanho_json):
+        tamanho = tamanho_json * FATOR_MEMORIA
+        if chave in self._memoria:
+            self._bytes_memoria -= self._memoria.pop(chave)[1]
+        if tamanho > self.max_bytes_memoria:
+            return
+        self._memoria[chave] = (modelo, tamanho)
+        self._bytes_memoria += tamanho
+        while self._bytes_memoria > self.max_bytes_memoria:
+            _, (_, removido) = self._memoria.popitem(last=False)
+            self._bytes_memoria -= removido
+
+    def _ler_disco(self, chave):
+        if not self.diretorio:
+            return None
+        caminho = self._caminho(chave)
+        try:
+            with gzip.open(caminho, "rb") as f:
+                dados = f.read()
+            modelo = json.loads(dados)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, zlib.error):
+            # Entrada truncada ou corrompida: vira falta e é regravada
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        return modelo, len(dados)
+
+    def _gravar_disco(self, chave, dados):
+        if not self.diretorio:
+            return
+        fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as bruto, gzip.GzipFile(fileobj=bruto, mode="wb", compresslevel=1) as f:
+                f.write(dados)
+            os.replace(temporario, self._caminho(chave))
+        except OSError:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            return
+        self._despejar()
+
+    def _despejar(self):
+        entradas = []
+        for nome in os.listdir(self.diretorio):
+            if not nome.endswith(".json.gz"):
+                continue
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                info = os.stat(caminho)
+            except OSError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, caminho))
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= self.max_bytes_disco:
+                break
+            try:
+                os.remove(caminho)
+            except OSError:
+                continue
+            total -= tamanho
+
+    def obter(self, arquivo, chave=None):
+        """Modelo de `arquivo` (caminho ou objeto de arquivo), do cache se possível."""
+        chave = chave or hash_arquivo(arquivo)
+        with self._lock:
+            if chave in self._memoria:
+                self._memoria.move_to_end(chave)
+                self.estatisticas["acertos_memoria"] += 1
+                return self._memoria[chave][0]
+        lido = self._ler_disco(chave)
+        if lido is not None:
+            modelo, tamanho = lido
+            with self._lock:
+                self.estatisticas["acertos_disco"] += 1
+                self._guardar_memoria(chave, modelo, tamanho)
+            return modelo
+        modelo = carregar_data_model(arquivo)
+        dados = json.dumps(modelo, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            self.estatisticas["faltas"] += 1
+            self._guardar_memoria(chave, modelo, len(dados))
+        self._gravar_disco(chave, dados)
+        return modelo
+
+    def limpar(self):
+        with self._lock:
+            self._memoria.clear()
+            self._bytes_memoria = 0
+        if self.diretorio:
+            for nome in os.listdir(self.diretorio):
+                if nome.endswith(".json.gz"):
+                    os.remove(os.path.join(self.diretorio, nome))
@@ -0,0 +1,214 @@
+from dependencias import chave, fechos_impacto, indexar_dependencias
+from renomeacao import detectar_renomeacoes
+
+
+# -----------------------------
+# Função para comparar dois modelos
+# -----------------------------
+def _mesmo_hash(antigo, novo):
+    # Modelos sem hash (ex.: montados à mão) caem na comparação campo a campo
+    h = antigo.get("hash")
+    return h is not None and h == novo.get("hash")
+
+
+def _objeto(tipo, tabela, nome):
+    return {"tipo": tipo, "tabela": tabela, "nome": nome}
+
+
+def _candidatos_tabela(destino, tabela):
+    # Objetos de uma tabela inteira adicionada/removida: não são listados um a
+    # um, mas podem ter sido movidos para (ou de) outra tabela
+    tname = tabela["name"]
+    destino.extend(("Coluna", tname, c, False) for c in tabela.get("columns", []))
+    destino.extend(("Medida", tname, m, False) for m in tabela.get("measures", []))
+
+
+def _indice(model):
+    # Modelos do cache já trazem o índice; os demais são indexados aqui
+    dependencias = model.get("dependencias") or indexar_dependencias(model.get("tables", []))
+    medidas = {chave(t["name"], m["name"]) for t in model.get("tables", []) for m in t.get("measures", [])}
+    return dependencias["dependentes"], medidas
+
+
+def comparar_modelos(old_model, new_model):
+    report = {"added": [], "removed": [], "modified": [], "renamed": [], "impact": [], "impact_medidas": []}
+    if _mesmo_hash(old_model, new_model):
+        return report
+
+    # Colunas/medidas adicionadas e removidas ficam pendentes até a detecção
+    # de renomeações: (tipo, tabela, item, listar)
+    adicionados, removidos = [], []
+
+    old_tables = {t["name"]: t for t in old_model.get("tables", [])}
+    new_tables = {t["name"]: t for t in new_model.get("tables", [])}
+
+    # Tabelas adicionadas/retiradas
+    added_tables = set(new_tables) - set(old_tables)
+    removed_tables = set(old_tables) - set(new_tables)
+    report["added"].extend([_objeto("Tabela", t, t) for t in added_tables])
+    report["removed"].extend([_objeto("Tabela", t, t) for t in removed_tables])
+    for tname in added_tables:
+        _candidatos_tabela(adicionados, new_tables[tname])
+    for tname in removed_tables:
+        _candidatos_tabela(removidos, old_tables[tname])
+
+    # Tabelas existentes → checar colunas/medidas, só onde o hash mudou
+    for tname in set(old_tables) & set(new_tables):
+        old_t, new_t = old_tables[tname], new_tables[tname]
+        if _mesmo_hash(old_t, new_t):
+            continue
+
+        old_cols = {c["name"]: c for c in old_t.get("columns", [])}
+        new_cols = {c["name"]: c for c in new_t.get("columns", [])}
+
+        # Colunas adicionadas/retiradas
+        added_cols = set(new_cols) - set(old_cols)
+        removed_cols = set(old_cols) - set(new_cols)
+        adicionados.extend(("Coluna", tname, new_cols[c], True) for c in added_cols)
+        removidos.extend(("Coluna", tname, old_cols[c], True) for c in removed_cols)
+
+        # Colunas modificadas
+        for cname in set(old_cols) & set(new_cols):
+            old_c, new_c = old_cols[cname], new_cols[cname]
+            if _mesmo_hash(old_c, new_c):
+                continue
+            if old_c.get("description","") != new_c.get("description",""):
+                report["modified"].append({
+                    "tipo": "Coluna",
+                    "tabela": tname,
+                    "nome": cname,
+                    "alteracao_tipo": "descrição",
+                    "valor_antigo": old_c.get("description",""),
+                    "valor_novo": new_c.get("description","")
+                })
+            if old_c.get("dataType","") != new_c.get("dataType",""):
+                report["modified"].append({
+                    "tipo": "Coluna",
+                    "tabela": tname,
+                    "nome": cname,
+                    "alteracao_tipo": "tipo",
+                    "valor_antigo": old_c.get("dataType",""),
+                    "valor_novo": new_c.get("dataType","")
+                })
+            if old_c.get("expression","") != new_c.get("expression",""):
+                # Coluna calculada
+                report["modified"].append({
+                    "tipo": "Coluna",
+                    "tabela": tname,
+                    "nome": cname,
+                    "alteracao_tipo": "DAX",
+                    "valor_antigo": old_c.get("expression",""),
+                    "valor_novo": new_c.get("expression","")
+                })
+            if old_c.get("sourceColumn","") != new_c.get("sourceColumn",""):
+                # Coluna de dados passou a ler outra coluna da origem
+                report["modified"].append({
+                    "tipo": "Coluna",
+                    "tabela": tname,
+                    "nome": cname,
+                    "alteracao_tipo": "origem",
+                    "valor_antigo": old_c.get("sourceColumn",""),
+                    "valor_novo": new_c.get("sourceColumn","")
+                })
+
+        # Medidas adicionadas/retiradas/modificadas
+        old_measures = {m["name"]: m for m in old_t.get("measures", [])}
+        new_measures = {m["name"]: m for m in new_t.get("measures", [])}
+
+        added_measures = set(new_measures) - set(old_measures)
+        removed_measures = set(old_measures) - set(new_measures)
+        adicionados.extend(("Medida", tname, new_measures[m], True) for m in added_measures)
+        removidos.extend(("Medida", tname, old_measures[m], True) for m in removed_measures)
+
+        for mname in set(old_measures) & set(new_measures):
+            old_m, new_m = old_measures[mname], new_measures[mname]
+            if _mesmo_hash(old_m, new_m):
+                continue
+            if old_m.get("expression","") != new_m.get("expression",""):
+                report["modified"].append({
+                    "tipo": "Medida",
+                    "tabela": tname,
+                    "nome": mname,
+                    "alteracao_tipo": "DAX",
+                    "valor_antigo": old_m.get("expression",""),
+                    "valor_novo": new_m.get("expression","")
+                })
+            if old_m.get("description","") != new_m.get("description",""):
+                report["modified"].append({
+                    "tipo": "Medida",
+                    "tabela": tname,
+                    "nome": mname,
+                    "alteracao_tipo": "descrição",
+                    "valor_antigo": old_m.get("description",""),
+                    "valor_novo": new_m.get("description","")
+                })
+
+    # Remoção + adição com a mesma definição → renomeação/movimentação
+    pares = detectar_renomeacoes(
+        [(tipo, tabela, item) for tipo, tabela, item, _ in removidos],
+        [(tipo, tabela, item) for tipo, tabela, item, _ in adicionados],
+    )
+    renomeados_rem, renomeados_add = set(), set()
+    for i, j, similaridade in pares:
+        tipo, tabela_antiga, antigo, _ = removidos[i]
+        _, tabela, novo, _ = adicionados[j]
+        renomeados_rem.add(i)
+        renomeados_add.add(j)
+        report["renamed"].append({
+            "tipo": tipo,
+            "tabela": tabela,
+            "nome": novo["name"],
+            "alteracao_tipo": "renomeado",
+            "tabela_anterior": tabela_antiga,
+            "nome_anterior": antigo["name"],
+            "similaridade": similaridade
+        })
+    report["added"].extend(
+        _objeto(tipo, tabela, item["name"]) for j, (tipo, tabela, item, listar) in enumerate(adicionados)
+        if listar and j not in renomeados_add
+    )
+    report["removed"].extend(
+        _objeto(tipo, tabela, item["name"]) for i, (tipo, tabela, item, listar) in enumerate(removidos)
+        if listar and i not in renomeados_rem
+    )
+
+    # Impacto: medidas que dependem do que mudou. Só contam mudanças que
+    # alteram o resultado das medidas (DAX, tipo e coluna de origem);
+    # descrição não. Removidos
+    # e renomeados usam o índice do modelo antigo (onde ainda eram
+    # referenciados), modificados o do novo.
+    # As medidas atingidas vão como máscara (hex) sobre report["impact_medidas"],
+    # uma base ordenada comum aos dois modelos.
+    indice_antigo, medidas_antigas = _indice(old_model)
+    indice_novo, medidas_novas = _indice(new_model)
+    origens = {}
+    for mod in report["modified"]:
+        if mod["alteracao_tipo"] in ("DAX", "tipo", "origem"):
+            origens.setdefault((mod["tipo"], mod["tabela"], mod["nome"]), "Modificado")
+    for i, (tipo, tabela, item, _) in enumerate(removidos):
+        origens[tipo, tabela, item["name"]] = "Renomeado" if i in renomeados_rem else "Removido"
+    if not origens:
+        return report
+
+    base = sorted(medidas_antigas | medidas_novas)
+    bits = {medida: posicao for posicao, medida in enumerate(base)}
+    fechos_novos = fechos_impacto(
+        indice_novo, [chave(t, n) for (_, t, n), alt in origens.items() if alt == "Modificado"], bits)
+    fechos_antigos = fechos_impacto(
+        indice_antigo, [chave(t, n) for (_, t, n), alt in origens.items() if alt != "Modificado"], bits)
+    for (tipo, tabela, nome), alteracao in origens.items():
+        fechos = fechos_novos if alteracao == "Modificado" else fechos_antigos
+        mascara = fechos[chave(tabela, nome)]
+        if mascara:
+            report["impact"].append({
+                "tipo": tipo,
+                "tabela": tabela,
+                "nome": nome,
+                "alteracao": alteracao,
+                "qtd_medidas": bin(mascara).count("1"),
+                "medidas_afetadas": f"{mascara:x}",
+            })
+    if report["impact"]:
+        report["impact_medidas"] = base
+
+    return report
@@ -0,0 +1,24 @@
+import re
+
+# -----------------------------
+# Utilitários de texto DAX
+# -----------------------------
+# Comentários (//, --, /* */) só valem fora de literais: "http://..." ou
+# 'Tabela--Antiga' não podem ser cortados. A expressão casa primeiro strings
+# e nomes de tabela entre aspas simples, que são mantidos (ou, com
+# remover_strings, substituídos por espaço), e só então comentários.
+
+_STRINGS_E_COMENTARIOS = re.compile(
+    r'("(?:[^"]|"")*")|(\'(?:[^\']|\'\')*\')|//[^\n]*|--[^\n]*|/\*.*?\*/', re.S
+)
+
+
+def remover_comentarios(expressao, remover_strings=False):
+    """Tira os comentários de `expressao`, respeitando literais."""
+    def substituir(m):
+        if m.group(1) is not None:
+            return " " if remover_strings else m.group(1)
+        if m.group(2) is not None:
+            return m.group(2)
+        return " "
+    return _STRINGS_E_COMENTARIOS.sub(substituir, expressao)
@@ -0,0 +1,121 @@
+import re
+from functools import lru_cache
+from itertools import groupby
+
+from dax import remover_comentarios
+
+# -----------------------------
+# Diff de expressões DAX
+# -----------------------------
+# Algoritmo de Myers na versão de espaço linear: acha a "cobra do meio" do
+# caminho de edição com buscas simultâneas pela frente e por trás, e resolve
+# as duas metades recursivamente. Memória O(N + M), tempo O((N + M) * D).
+# O diff só é calculado quando o usuário abre uma linha do relatório, e os
+# resultados ficam num cache LRU limitado para reaberturas.
+
+TAMANHO_CACHE = 256
+
+_ESPACOS = re.compile(r"[ \t]+")
+_TOKENS = re.compile(r"'[^']*'|\[[^\]]*\]|\"[^\"]*\"|\w+|\s+|[^\s\w]")
+
+
+def _cobra_do_meio(a, alo, ahi, b, blo, bhi):
+    """Retorna (x0, y0, x1, y1): trecho diagonal no meio do caminho mínimo."""
+    n, m = ahi - alo, bhi - blo
+    delta = n - m
+    impar = delta & 1
+    limite = (n + m + 1) // 2
+    desloc = limite + 1
+    vf = [0] * (2 * limite + 3)
+    vb = [0] * (2 * limite + 3)
+    for d in range(limite + 1):
+        # Busca pela frente: vf[k] = maior x alcançado na diagonal k = x - y
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vf[k - 1 + desloc] < vf[k + 1 + desloc]):
+                x = vf[k + 1 + desloc]
+            else:
+                x = vf[k - 1 + desloc] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            vf[k + desloc] = x
+            c = delta - k
+            if impar and -(d - 1) <= c <= d - 1 and x + vb[c + desloc] >= n:
+                return alo + x0, blo + y0, alo + x, blo + y
+        # Busca por trás, nas sequências invertidas
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vb[k - 1 + desloc] < vb[k + 1 + desloc]):
+                x = vb[k + 1 + desloc]
+            else:
+                x = vb[k - 1 + desloc] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[ahi - 1 - x] == b[bhi - 1 - y]:
+                x += 1
+                y += 1
+            vb[k + desloc] = x
+            c = delta - k
+            if not impar and -d <= c <= d and x + vf[c + desloc] >= n:
+                return ahi - x, bhi - y, ahi - x0, bhi - y0
+    raise AssertionError("caminho de edição não encontrado")
+
+
+def _myers(a, alo, ahi, b, blo, bhi, saida):
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        saida.append((" ", a[alo]))
+        alo += 1
+        blo += 1
+    sufixo = 0
+    while alo < ahi - sufixo and blo < bhi - sufixo and a[ahi - 1 - sufixo] == b[bhi - 1 - sufixo]:
+        sufixo += 1
+    ahi -= sufixo
+    bhi -= sufixo
+    if alo == ahi:
+        saida.extend(("+", item) for item in b[blo:bhi])
+    elif blo == bhi:
+        saida.extend(("-", item) for item in a[alo:ahi])
+    else:
+        # Sem prefixo/sufixo em comum, D >= 2: as duas metades são menores
+        x0, y0, x1, y1 = _cobra_do_meio(a, alo, ahi, b, blo, bhi)
+        _myers(a, alo, x0, b, blo, y0, saida)
+        saida.extend((" ", item) for item in a[x0:x1])
+        _myers(a, x1, ahi, b, y1, bhi, saida)
+    saida.extend((" ", item) for item in a[ahi:ahi + sufixo])
+
+
+def diff_sequencias(a, b):
+    """Lista de (op, item) com op em ' ', '-', '+'."""
+    saida = []
+    _myers(a, 0, len(a), b, 0, len(b), saida)
+    return saida
+
+
+def normalizar_dax(expressao):
+    """Remove comentários, espaços repetidos e linhas vazias."""
+    linhas = (_ESPACOS.sub(" ", linha).strip() for linha in remover_comentarios(expressao).splitlines())
+    return "\n".join(linha for linha in linhas if linha)
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def diff_expressoes(antigo, novo, nivel="linhas", normalizar=False):
+    """Diff de duas expressões por linha ou por token (tupla de (op, texto))."""
+    if normalizar:
+        antigo, novo = normalizar_dax(antigo), normalizar_dax(novo)
+    if nivel == "tokens":
+        a, b = _TOKENS.findall(antigo), _TOKENS.findall(novo)
+    else:
+        a, b = antigo.splitlines(), novo.splitlines()
+    return tuple(diff_sequencias(a, b))
+
+
+def formatar_diff(ops, nivel="linhas"):
+    """Texto do diff: formato unificado por linha, [-...-]{+...+} por token."""
+    if nivel != "tokens":
+        return "\n".join(f"{op} {texto}" for op, texto in ops)
+    partes = []
+    for op, grupo in groupby(ops, key=lambda o: o[0]):
+        texto = "".join(t for _, t in grupo)
+        partes.append(texto if op == " " else f"[-{texto}-]" if op == "-" else f"{{+{texto}+}}")
+    return "".join(partes)
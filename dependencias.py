@@ -0,0 +1,143 @@
+import re
+
+from dax import remover_comentarios
+
+# -----------------------------
+# Índice de dependências entre medidas e colunas
+# -----------------------------
+# Na carga do modelo, as expressões de medidas e colunas calculadas passam
+# por um tokenizador simples que extrai referências 'Tabela'[Coluna] e
+# [Medida]. O índice guarda as arestas nos dois sentidos:
+#   referencias[objeto] → objetos usados na expressão
+#   dependentes[objeto] → objetos cuja expressão usa `objeto`
+# A análise de impacto só percorre `dependentes`, sem reler expressões.
+# Objetos são identificados por "Tabela[Nome]".
+#
+# O fecho transitivo (medidas atingidas por um objeto) é calculado uma vez
+# por componente fortemente conexo do grafo, como máscara de bits sobre uma
+# base ordenada de medidas: objetos que compartilham dependentes reaproveitam
+# o resultado em vez de repetir a busca, e o report guarda a máscara, não a
+# lista. `medidas_da_mascara` decodifica sob demanda.
+
+# \b: o nome de tabela sem aspas só começa no início de uma palavra; sem ele
+# a busca recomeça em cada caractere de identificadores longos
+_REFERENCIA = re.compile(r"(?:'((?:[^']|'')+)'|\b([A-Za-z_]\w*))?\[([^\]]+)\]")
+
+
+def chave(tabela, nome):
+    return f"{tabela}[{nome}]"
+
+
+def extrair_referencias(expressao, tabela, medidas, colunas):
+    """Chaves dos objetos referenciados por `expressao`.
+
+    `medidas` mapeia nome da medida → chave (nomes de medida são únicos no
+    modelo) e `colunas` é o conjunto de chaves de colunas existentes.
+    """
+    referencias = set()
+    for tabela_ref, tabela_sem_aspas, nome in _REFERENCIA.findall(remover_comentarios(expressao, remover_strings=True)):
+        tabela_ref = (tabela_ref.replace("''", "'") or tabela_sem_aspas)
+        if tabela_ref:
+            alvo = chave(tabela_ref, nome)
+            if alvo in colunas:
+                referencias.add(alvo)
+                continue
+        if nome in medidas:
+            referencias.add(medidas[nome])
+        elif chave(tabela, nome) in colunas:
+            # [Coluna] sem tabela: coluna da própria tabela (contexto de linha)
+            referencias.add(chave(tabela, nome))
+    return referencias
+
+
+def indexar_dependencias(tabelas):
+    """Monta {"referencias": ..., "dependentes": ...} para as tabelas compactas."""
+    medidas = {m["name"]: chave(t["name"], m["name"]) for t in tabelas for m in t.get("measures", [])}
+    colunas = {chave(t["name"], c["name"]) for t in tabelas for c in t.get("columns", [])}
+    referencias, dependentes = {}, {}
+    for t in tabelas:
+        for item in t.get("measures", []) + t.get("columns", []):
+            expressao = item.get("expression")
+            if not expressao:
+                continue
+            origem = chave(t["name"], item["name"])
+            usados = extrair_referencias(expressao, t["name"], medidas, colunas)
+            usados.discard(origem)
+            if usados:
+                referencias[origem] = sorted(usados)
+                for alvo in usados:
+                    dependentes.setdefault(alvo, []).append(origem)
+    return {"referencias": referencias, "dependentes": dependentes}
+
+
+def fechos_impacto(dependentes, origens, bits):
+    """Máscara das medidas atingidas, direta ou transitivamente, por cada origem.
+
+    `bits` mapeia chave da medida → posição do bit. A busca passa também por
+    colunas calculadas, mas só marca as chaves que estão em `bits`; a própria
+    origem nunca entra. Tarjan iterativo: cada nó alcançável a partir das
+    origens é visitado uma vez, e ciclos viram um único componente.
+    """
+    fecho, indice, baixo = {}, {}, {}
+    pilha, na_pilha = [], set()
+    for raiz in origens:
+        if raiz in indice:
+            continue
+        indice[raiz] = baixo[raiz] = len(indice)
+        pilha.append(raiz)
+        na_pilha.add(raiz)
+        trabalho = [(raiz, iter(dependentes.get(raiz, ())))]
+        while trabalho:
+            no, filhos = trabalho[-1]
+            for filho in filhos:
+                if filho not in indice:
+                    indice[filho] = baixo[filho] = len(indice)
+                    pilha.append(filho)
+                    na_pilha.add(filho)
+                    trabalho.append((filho, iter(dependentes.get(filho, ()))))
+                    break
+                if filho in na_pilha:
+                    baixo[no] = min(baixo[no], indice[filho])
+            else:
+                trabalho.pop()
+                if trabalho:
+                    pai = trabalho[-1][0]
+                    baixo[pai] = min(baixo[pai], baixo[no])
+                if baixo[no] != indice[no]:
+                    continue
+                componente = []
+                while True:
+                    membro = pilha.pop()
+                    na_pilha.discard(membro)
+                    componente.append(membro)
+                    if membro == no:
+                        break
+                mascara = 0
+                for membro in componente:
+                    for filho in dependentes.get(membro, ()):
+                        if filho in fecho:  # membros do componente ainda não estão
+                            mascara |= fecho[filho] | (1 << bits[filho] if filho in bits else 0)
+                if len(componente) > 1:
+                    # Num ciclo todos se alcançam
+                    for membro in componente:
+                        if membro in bits:
+                            mascara |= 1 << bits[membro]
+                for membro in componente:
+                    fecho[membro] = mascara
+    return {
+        origem: fecho[origem] & ~(1 << bits[origem]) if origem in bits else fecho[origem]
+        for origem in origens
+    }
+
+
+def medidas_da_mascara(base, mascara, limite=None):
+    """Chaves de `base` marcadas em `mascara` (int ou hex), em ordem, até `limite`."""
+    if isinstance(mascara, str):
+        mascara = int(mascara, 16)
+    bits = bin(mascara)[:1:-1]
+    posicao = bits.find("1")
+    while posicao != -1 and limite != 0:
+        yield base[posicao]
+        if limite is not None:
+            limite -= 1
+        posicao = bits.find("1", posicao + 1)
@@ -0,0 +1,140 @@
+import xlsxwriter
+
+from dependencias import medidas_da_mascara
+from relatorio import CATEGORIAS, CHAVES_REPORT, COLUNAS, COLUNAS_IMPACTO, linhas_relatorio, lista_impacto
+
+# -----------------------------
+# Exportação do relatório (Excel / Parquet)
+# -----------------------------
+# As linhas saem direto do(s) report(s) para o arquivo, sem montar um
+# DataFrame antes. No Excel o xlsxwriter roda em constant_memory: cada linha
+# é descarregada em disco assim que a próxima começa, então a memória fica
+# estável mesmo com milhões de alterações vindas da auditoria em lote.
+#
+# No Parquet o impacto vai num arquivo separado (exportar_parquet_impacto),
+# já que as colunas são outras.
+#
+# `comparacoes` é uma lista de (anterior, atual, report), como a gerada por
+# auditoria.auditar ou por uma análise única no app.
+
+COLUNAS_EXPORTACAO = ["anterior", "atual"] + COLUNAS
+ABAS = {
+    "Adicionado": "Adicionados",
+    "Removido": "Removidos",
+    "Modificado": "Modificados",
+    "Renomeado": "Renomeados",
+}
+MAX_LINHAS_ABA = 1_048_575  # limite do Excel, descontado o cabeçalho
+MAX_CARACTERES_CELULA = 32_767
+MAX_MEDIDAS_CELULA = 2_000  # mais que isso não cabe em MAX_CARACTERES_CELULA
+LINHAS_POR_LOTE = 50_000
+
+
+def _linhas(comparacoes, categoria):
+    for anterior, atual, report in comparacoes:
+        for linha in linhas_relatorio(report, categorias=[categoria]):
+            yield (anterior, atual) + linha
+
+
+def _escrever_linha(aba, numero, linha):
+    for coluna, valor in enumerate(linha):
+        if valor is None or valor == "":
+            continue
+        if isinstance(valor, (int, float)):
+            aba.write_number(numero, coluna, valor)
+        else:
+            # write_string evita que expressões começando com "=" virem fórmula
+            aba.write_string(numero, coluna, str(valor)[:MAX_CARACTERES_CELULA])
+
+
+def _linhas_impacto(comparacoes):
+    for anterior, atual, report in comparacoes:
+        for imp in report.get("impact", []):
+            yield (anterior, atual, imp["alteracao"], imp["tipo"], imp["tabela"], imp["nome"],
+                   imp["qtd_medidas"], lista_impacto(report, imp, MAX_MEDIDAS_CELULA))
+
+
+def _escrever_abas(workbook, negrito, titulo, cabecalho, linhas):
+    aba, parte, numero = None, 0, MAX_LINHAS_ABA
+    for linha in linhas:
+        if numero >= MAX_LINHAS_ABA:
+            # Aba cheia: continua em "Modificados (2)", "(3)"...
+            parte += 1
+            aba = workbook.add_worksheet(titulo if parte == 1 else f"{titulo} ({parte})")
+            aba.write_row(0, 0, cabecalho, negrito)
+            numero = 0
+        numero += 1
+        _escrever_linha(aba, numero, linha)
+    if aba is None:
+        workbook.add_worksheet(titulo).write_row(0, 0, cabecalho, negrito)
+
+
+def exportar_excel(destino, comparacoes):
+    """Grava resumo, uma aba por categoria e o impacto em `destino`."""
+    workbook = xlsxwriter.Workbook(destino, {"constant_memory": True})
+    negrito = workbook.add_format({"bold": True})
+
+    resumo = workbook.add_worksheet("Resumo")
+    resumo.write_row(0, 0, ["anterior", "atual"] + CATEGORIAS, negrito)
+    for numero, (anterior, atual, report) in enumerate(comparacoes, start=1):
+        resumo.write_string(numero, 0, anterior)
+        resumo.write_string(numero, 1, atual)
+        for coluna, categoria in enumerate(CATEGORIAS, start=2):
+            resumo.write_number(numero, coluna, len(report.get(CHAVES_REPORT[categoria], [])))
+
+    for categoria in CATEGORIAS:
+        _escrever_abas(workbook, negrito, ABAS[categoria], COLUNAS_EXPORTACAO, _linhas(comparacoes, categoria))
+    _escrever_abas(workbook, negrito, "Impacto", ["anterior", "atual"] + COLUNAS_IMPACTO, _linhas_impacto(comparacoes))
+
+    workbook.close()
+
+
+def exportar_parquet(destino, comparacoes):
+    """Grava todas as linhas num Parquet, em lotes de LINHAS_POR_LOTE."""
+    import pyarrow as pa
+
+    schema = pa.schema(
+        [(coluna, pa.string()) for coluna in COLUNAS_EXPORTACAO[:-1]] + [("similaridade", pa.float64())]
+    )
+    _gravar_parquet(destino, schema, (linha for categoria in CATEGORIAS for linha in _linhas(comparacoes, categoria)))
+
+
+def exportar_parquet_impacto(destino, comparacoes):
+    """Grava o impacto (a aba Impacto do Excel) num Parquet à parte.
+
+    Aqui não há limite de célula: medidas_afetadas vai como lista completa.
+    """
+    import pyarrow as pa
+
+    schema = pa.schema(
+        [(coluna, pa.string()) for coluna in ["anterior", "atual"] + COLUNAS_IMPACTO[:-2]]
+        + [("qtd_medidas", pa.int64()), ("medidas_afetadas", pa.list_(pa.string()))]
+    )
+    linhas = (
+        (anterior, atual, imp["alteracao"], imp["tipo"], imp["tabela"], imp["nome"], imp["qtd_medidas"],
+         list(medidas_da_mascara(report["impact_medidas"], imp["medidas_afetadas"])))
+        for anterior, atual, report in comparacoes for imp in report.get("impact", [])
+    )
+    _gravar_parquet(destino, schema, linhas)
+
+
+def _gravar_parquet(destino, schema, linhas):
+    import pyarrow.parquet as pq
+
+    with pq.ParquetWriter(destino, schema, compression="zstd") as writer:
+        lote = []
+        for linha in linhas:
+            lote.append(linha)
+            if len(lote) >= LINHAS_POR_LOTE:
+                writer.write_batch(_lote_arrow(schema, lote))
+                lote = []
+        if lote:
+            writer.write_batch(_lote_arrow(schema, lote))
+
+
+def _lote_arrow(schema, lote):
+    import pyarrow as pa
+
+    colunas = list(zip(*lote))
+    return pa.record_batch([pa.array(valores, type=campo.type) for valores, campo in zip(colunas, schema)],
+                           schema=schema)
@@ -0,0 +1,214 @@
+import codecs
+import hashlib
+import json
+import sys
+import zipfile
+
+from dependencias import indexar_dependencias
+
+# -----------------------------
+# Leitura incremental do DataModelSchema
+# -----------------------------
+# O DataModelSchema de um PBIT é um JSON (normalmente UTF-16) com o modelo
+# tabular completo. Para a comparação só interessam as tabelas, com suas
+# colunas e medidas, então o arquivo é lido em blocos e cada tabela é
+# decodificada e reduzida assim que fica completa no buffer. O restante do
+# documento (relacionamentos, anotações, culturas...) nem chega a ser lido.
+#
+# Pico de memória, aproximadamente:
+#   TAMANHO_BLOCO (bytes comprimidos/descomprimidos em trânsito)
+#   + 2x o texto da maior tabela (o buffer dobra a cada tentativa de parse)
+#   + a árvore Python dessa tabela enquanto é reduzida
+#   + o modelo compacto acumulado.
+# Valores que aparecem antes de "tables" (ex.: "dataAccessOptions") entram na
+# mesma conta. Nunca se mantém o arquivo inteiro descomprimido nem a árvore
+# JSON completa, como fazia o json.loads(z.read(...)).
+
+TAMANHO_BLOCO = 1 << 20
+
+CAMPOS_COLUNA = ("name", "dataType", "description", "expression", "sourceColumn")
+CAMPOS_MEDIDA = ("name", "description", "expression")
+
+_decoder = json.JSONDecoder()
+_ESPACOS = " \t\r\n"
+
+
+class _LeitorIncremental:
+    """Buffer de texto alimentado sob demanda a partir do stream do zip."""
+
+    def __init__(self, stream, tamanho_bloco=TAMANHO_BLOCO):
+        self.stream = stream
+        self.tamanho_bloco = tamanho_bloco
+        inicio = stream.read(4)
+        self.decoder = codecs.getincrementaldecoder(json.detect_encoding(inicio))()
+        self.buf = self.decoder.decode(inicio).lstrip("\ufeff")
+        self.pos = 0
+        self.fim = False
+
+    def _ler(self):
+        dados = self.stream.read(self.tamanho_bloco)
+        if not dados:
+            self.buf += self.decoder.decode(b"", final=True)
+            self.fim = True
+            return False
+        # Descarta o que já foi consumido antes de crescer o buffer
+        self.buf = self.buf[self.pos:] + self.decoder.decode(dados)
+        self.pos = 0
+        return True
+
+    def caractere(self):
+        """Próximo caractere significativo (sem consumir), ou '' no fim."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _ESPACOS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._ler():
+                return ""
+
+    def esperar(self, c):
+        if self.caractere() != c:
+            raise ValueError(f"DataModelSchema: esperado {c!r} na posição {self.pos}")
+        self.pos += 1
+
+    def valor(self):
+        """Decodifica o próximo valor JSON completo, lendo mais blocos se preciso."""
+        self.caractere()
+        while True:
+            tamanho = len(self.buf)
+            try:
+                obj, fim = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fim:
+                    raise
+            else:
+                # Um número pode estar cortado no limite do bloco
+                if fim < len(self.buf) or self.fim or not isinstance(obj, (int, float)):
+                    self.pos = fim
+                    return obj
+            # Dobra o trecho pendente antes de tentar de novo: custo amortizado linear
+            alvo = 2 * (tamanho - self.pos) + self.tamanho_bloco
+            while len(self.buf) - self.pos < alvo and self._ler():
+                pass
+
+
+def _entrar_em(leitor, chave):
+    """Avança dentro do objeto atual até o valor de `chave`."""
+    leitor.esperar("{")
+    while leitor.caractere() != "}":
+        nome = leitor.valor()
+        leitor.esperar(":")
+        if nome == chave:
+            return
+        leitor.valor()
+        if leitor.caractere() == ",":
+            leitor.pos += 1
+    raise KeyError(chave)
+
+
+# -----------------------------
+# Hashes estruturais (árvore de Merkle)
+# -----------------------------
+# Cada coluna e medida guarda o hash dos seus campos e cada tabela o hash do
+# nome mais os hashes dos filhos (ordenados, já que a comparação é por nome).
+# O modelo guarda o hash de todas as tabelas. Assim comparar_modelos pula
+# modelos e tabelas idênticos sem olhar o conteúdo.
+
+def _hash(*partes):
+    h = hashlib.blake2b(digest_size=16)
+    for parte in partes:
+        h.update(parte.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def _hash_item(item, campos):
+    return _hash(*(f"{campo}={item.get(campo, '')}" for campo in campos))
+
+
+def _hash_tabela(nome, colunas, medidas):
+    return _hash(
+        nome,
+        "columns", *sorted(c["hash"] for c in colunas),
+        "measures", *sorted(m["hash"] for m in medidas),
+    )
+
+
+def _compactar_itens(itens, campos):
+    compactos = []
+    for item in itens or []:
+        c = {}
+        for campo in campos:
+            valor = item.get(campo)
+            if valor is None:
+                continue
+            if isinstance(valor, list):
+                # O TMSL permite expressões quebradas em lista de linhas
+                valor = "\n".join(valor)
+            if campo in ("name", "dataType"):
+                valor = sys.intern(valor)
+            c[campo] = valor
+        c["hash"] = _hash_item(c, campos)
+        compactos.append(c)
+    return compactos
+
+
+def compactar_tabela(tabela):
+    """Reduz uma tabela do TMSL aos campos usados na comparação."""
+    nome = sys.intern(tabela.get("name", ""))
+    colunas = _compactar_itens(tabela.get("columns"), CAMPOS_COLUNA)
+    medidas = _compactar_itens(tabela.get("measures"), CAMPOS_MEDIDA)
+    return {
+        "name": nome,
+        "hash": _hash_tabela(nome, colunas, medidas),
+        "columns": colunas,
+        "measures": medidas,
+    }
+
+
+def _tabelas_streaming(stream):
+    leitor = _LeitorIncremental(stream)
+    _entrar_em(leitor, "model")
+    try:
+        _entrar_em(leitor, "tables")
+    except KeyError:
+        return []
+    tabelas = []
+    leitor.esperar("[")
+    while leitor.caractere() != "]":
+        tabelas.append(compactar_tabela(leitor.valor()))
+        if leitor.caractere() == ",":
+            leitor.pos += 1
+    return tabelas
+
+
+def _tabelas_completo(z):
+    data_model = json.loads(z.read("DataModelSchema"))
+    return [compactar_tabela(t) for t in data_model.get("model", {}).get("tables", [])]
+
+
+# -----------------------------
+# Função para extrair DataModel do PBIT
+# -----------------------------
+def carregar_data_model(uploaded_file, streaming=True):
+    """Carrega o modelo compacto ({"tables": [...], ...}) de um PBIT.
+
+    Com `streaming=True` o DataModelSchema é lido em blocos (ver o limite de
+    memória no topo do módulo); se a estrutura não for a esperada, cai no
+    parse completo com json.loads.
+    """
+    with zipfile.ZipFile(uploaded_file, "r") as z:
+        tabelas = None
+        if streaming:
+            try:
+                with z.open("DataModelSchema") as stream:
+                    tabelas = _tabelas_streaming(stream)
+            except (ValueError, KeyError, UnicodeDecodeError):
+                tabelas = None
+        if tabelas is None:
+            tabelas = _tabelas_completo(z)
+    return {
+        "hash": _hash(*sorted(t["hash"] for t in tabelas)),
+        "tables": tabelas,
+        "dependencias": indexar_dependencias(tabelas),
+    }
@@ -0,0 +1,82 @@
+import pandas as pd
+
+from dependencias import medidas_da_mascara
+
+# -----------------------------
+# Relatório em formato colunar
+# -----------------------------
+# Uma linha por alteração, com as mesmas colunas para todas as categorias.
+# O DataFrame é montado uma vez por análise; filtros, paginação e o resumo
+# trabalham sobre ele sem refazer a comparação.
+
+COLUNAS = ["alteracao", "tipo", "tabela", "nome", "campo", "valor_antigo", "valor_novo", "similaridade"]
+CATEGORIAS = ["Adicionado", "Removido", "Modificado", "Renomeado"]
+COLUNAS_IMPACTO = ["alteracao", "tipo", "tabela", "nome", "qtd_medidas", "medidas_afetadas"]
+PREVIA_IMPACTO = 10  # medidas listadas por linha; a contagem vai completa
+
+
+CHAVES_REPORT = {"Adicionado": "added", "Removido": "removed", "Modificado": "modified", "Renomeado": "renamed"}
+
+
+def linhas_relatorio(report, categorias=CATEGORIAS):
+    """Gera as linhas do relatório como tuplas na ordem de COLUNAS."""
+    for categoria in categorias:
+        for item in report.get(CHAVES_REPORT[categoria], []):
+            if categoria in ("Adicionado", "Removido"):
+                yield (categoria, item["tipo"], item["tabela"], item["nome"], "", "", "", None)
+            elif categoria == "Modificado":
+                yield (categoria, item["tipo"], item["tabela"], item["nome"], item["alteracao_tipo"],
+                       item["valor_antigo"], item["valor_novo"], None)
+            else:
+                yield (categoria, item["tipo"], item["tabela"], item["nome"], item["alteracao_tipo"],
+                       f"{item['tabela_anterior']}[{item['nome_anterior']}]",
+                       f"{item['tabela']}[{item['nome']}]", item["similaridade"])
+
+
+def montar_dataframe(report):
+    df = pd.DataFrame.from_records(linhas_relatorio(report), columns=COLUNAS)
+    # Colunas repetitivas como category: filtros viram comparação de códigos
+    df["alteracao"] = pd.Categorical(df["alteracao"], categories=CATEGORIAS)
+    for coluna in ("tipo", "tabela", "campo"):
+        df[coluna] = df[coluna].astype("category")
+    df["similaridade"] = df["similaridade"].astype("float64")
+    return df
+
+
+def lista_impacto(report, imp, limite=PREVIA_IMPACTO):
+    """Medidas afetadas por uma entrada de report["impact"], como texto."""
+    medidas = ", ".join(medidas_da_mascara(report["impact_medidas"], imp["medidas_afetadas"], limite))
+    if limite is not None and imp["qtd_medidas"] > limite:
+        medidas += f", … (+{imp['qtd_medidas'] - limite})"
+    return medidas
+
+
+def montar_impacto(report):
+    """Uma linha por objeto alterado que atinge medidas (report["impact"])."""
+    return pd.DataFrame.from_records(
+        [
+            (imp["alteracao"], imp["tipo"], imp["tabela"], imp["nome"],
+             imp["qtd_medidas"], lista_impacto(report, imp))
+            for imp in report.get("impact", [])
+        ],
+        columns=COLUNAS_IMPACTO,
+    )
+
+
+def resumo(df):
+    """Quantidade por categoria, para o gráfico."""
+    contagem = df["alteracao"].value_counts(sort=False)
+    return pd.DataFrame({"Categoria": contagem.index.astype(str), "Quantidade": contagem.values})
+
+
+def filtrar(df, alteracoes=None, tipos=None, tabelas=None, busca=""):
+    mascara = pd.Series(True, index=df.index)
+    if alteracoes:
+        mascara &= df["alteracao"].isin(alteracoes)
+    if tipos:
+        mascara &= df["tipo"].isin(tipos)
+    if tabelas:
+        mascara &= df["tabela"].isin(tabelas)
+    if busca:
+        mascara &= df["nome"].str.contains(busca, case=False, regex=False)
+    return df[mascara]
@@ -0,0 +1,146 @@
+import hashlib
+import random
+import re
+
+from dax import remover_comentarios
+
+# -----------------------------
+# Detecção de renomeações/movimentações
+# -----------------------------
+# Uma medida renomeada ou movida de tabela aparece para o diff como uma
+# remoção mais uma adição. Aqui essas sobras são casadas pela definição:
+#   1. definições idênticas (após normalização) casam direto por dicionário;
+#   2. o resto passa por MinHash com LSH em bandas, e só os pares que caem no
+#      mesmo balde têm a similaridade de Jaccard calculada de fato.
+# Cada objeto é visitado um número constante de vezes, então o custo cresce
+# quase linearmente com o número de removidos + adicionados, em vez de
+# comparar todos contra todos.
+# Colunas de dados (sem expressão) só se identificam pelo sourceColumn, que
+# só tem sentido dentro da própria tabela de origem: elas só casam com
+# colunas da mesma tabela. Grupos maiores que MAX_BALDE, exatos ou por LSH,
+# são ambíguos demais e ficam de fora.
+
+LIMIAR_SIMILARIDADE = 0.8
+NUM_PERMUTACOES = 32
+LINHAS_POR_BANDA = 4
+MAX_BALDE = 64  # baldes maiores que isso são definições genéricas demais
+
+_TOKENS = re.compile(r"'[^']*'|\[[^\]]*\]|\"[^\"]*\"|\w+|[^\s\w]")
+
+_rng = random.Random(20240601)
+_MASCARAS = [_rng.getrandbits(64) for _ in range(NUM_PERMUTACOES)]
+
+
+def tokens_definicao(tipo, item):
+    """Tokens normalizados da definição de uma coluna ou medida."""
+    expressao = item.get("expression")
+    if expressao:
+        return _TOKENS.findall(remover_comentarios(expressao).lower())
+    if tipo == "Coluna" and item.get("sourceColumn"):
+        # Coluna de dados: a origem e o tipo são o que sobra para identificá-la
+        return ["source:" + item.get("sourceColumn", "").lower(), "type:" + item.get("dataType", "")]
+    return []
+
+
+def _shingles(tokens, k=3):
+    if len(tokens) < k:
+        return frozenset([tuple(tokens)]) if tokens else frozenset()
+    return frozenset(tuple(tokens[i:i + k]) for i in range(len(tokens) - k + 1))
+
+
+def _hash_shingle(shingle):
+    # hash() de str muda com PYTHONHASHSEED; aqui o resultado tem que ser estável
+    digest = hashlib.blake2b("\x1f".join(shingle).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _assinatura(shingles):
+    hashes = [_hash_shingle(s) for s in shingles]
+    return tuple(min(h ^ m for h in hashes) for m in _MASCARAS)
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def _escopo(tipo, tabela, item):
+    return tabela if tipo == "Coluna" and not item.get("expression") else None
+
+
+def detectar_renomeacoes(removidos, adicionados, limiar=LIMIAR_SIMILARIDADE):
+    """Casa objetos removidos com adicionados de definição parecida.
+
+    `removidos` e `adicionados` são listas de (tipo, tabela, item). Retorna
+    [(i_removido, j_adicionado, similaridade)], cada índice usado no máximo
+    uma vez, priorizando a maior similaridade e a mesma tabela.
+    """
+    shingles_rem = [_shingles(tokens_definicao(tipo, item)) for tipo, _, item in removidos]
+    shingles_add = [_shingles(tokens_definicao(tipo, item)) for tipo, _, item in adicionados]
+    escopo_rem = [_escopo(*obj) for obj in removidos]
+    escopo_add = [_escopo(*obj) for obj in adicionados]
+
+    candidatos = []
+    usados_rem, usados_add = set(), set()
+
+    # 1) Definições idênticas
+    exatos, adicionados_por_chave = {}, {}
+    for i, (tipo, _, _) in enumerate(removidos):
+        if shingles_rem[i]:
+            exatos.setdefault((tipo, escopo_rem[i], shingles_rem[i]), []).append(i)
+    for j, (tipo, _, _) in enumerate(adicionados):
+        if shingles_add[j]:
+            adicionados_por_chave.setdefault((tipo, escopo_add[j], shingles_add[j]), []).append(j)
+    for chave, fila in exatos.items():
+        js = adicionados_por_chave.get(chave, [])
+        if len(fila) > MAX_BALDE or len(js) > MAX_BALDE:
+            # Ambíguo: também não entra no LSH
+            usados_rem.update(fila)
+            usados_add.update(js)
+            fila.clear()
+    for j, (tipo, tabela, _) in enumerate(adicionados):
+        fila = exatos.get((tipo, escopo_add[j], shingles_add[j]))
+        if not fila or j in usados_add:
+            continue
+        # Preferência para quem ficou na mesma tabela
+        i = next((i for i in fila if removidos[i][1] == tabela), fila[0])
+        fila.remove(i)
+        candidatos.append((1.0, removidos[i][1] == tabela, i, j))
+        usados_rem.add(i)
+        usados_add.add(j)
+
+    # 2) MinHash + LSH para o restante
+    baldes = {}
+    for i, (tipo, _, _) in enumerate(removidos):
+        if i in usados_rem or not shingles_rem[i]:
+            continue
+        assinatura = _assinatura(shingles_rem[i])
+        for b in range(0, NUM_PERMUTACOES, LINHAS_POR_BANDA):
+            baldes.setdefault((tipo, escopo_rem[i], b, assinatura[b:b + LINHAS_POR_BANDA]), []).append(i)
+
+    for j, (tipo, tabela, _) in enumerate(adicionados):
+        if j in usados_add or not shingles_add[j]:
+            continue
+        assinatura = _assinatura(shingles_add[j])
+        vistos = set()
+        for b in range(0, NUM_PERMUTACOES, LINHAS_POR_BANDA):
+            balde = baldes.get((tipo, escopo_add[j], b, assinatura[b:b + LINHAS_POR_BANDA]), ())
+            if len(balde) > MAX_BALDE:
+                continue
+            for i in balde:
+                if i in vistos:
+                    continue
+                vistos.add(i)
+                similaridade = _jaccard(shingles_rem[i], shingles_add[j])
+                if similaridade >= limiar:
+                    candidatos.append((similaridade, removidos[i][1] == tabela, i, j))
+
+    # 3) Casamento guloso, um para um
+    pares = []
+    usados_rem, usados_add = set(), set()
+    for similaridade, _, i, j in sorted(candidatos, key=lambda c: (-c[0], not c[1], c[2], c[3])):
+        if i in usados_rem or j in usados_add:
+            continue
+        usados_rem.add(i)
+        usados_add.add(j)
+        pares.append((i, j, round(similaridade, 3)))
+    return pares
@@ -1,101 +1,29 @@
+import io
+
 import streamlit as st
-import zipfile, json
-import pandas as pd
 import altair as alt
 
-# -----------------------------
-# Função para extrair DataModel do PBIT
-# -----------------------------
-def carregar_data_model(uploaded_file):
-    with zipfile.ZipFile(uploaded_file, "r") as z:
-        data_model = json.loads(z.read("DataModelSchema"))
-    return data_model.get("model", {})
+from cache_modelos import CacheModelos
+from comparacao import comparar_modelos
+from dax_diff import diff_expressoes, formatar_diff
+from exportacao import exportar_excel, exportar_parquet, exportar_parquet_impacto
+from relatorio import CATEGORIAS, filtrar, montar_dataframe, montar_impacto, resumo
 
 # -----------------------------
-# Função para comparar dois modelos
+# Streamlit UI
 # -----------------------------
-def comparar_modelos(old_model, new_model):
-    report = {"added": [], "removed": [], "modified": []}
-
-    old_tables = {t["name"]: t for t in old_model.get("tables", [])}
-    new_tables = {t["name"]: t for t in new_model.get("tables", [])}
-
-    # Tabelas adicionadas/retiradas
-    added_tables = set(new_tables) - set(old_tables)
-    removed_tables = set(old_tables) - set(new_tables)
-    report["added"].extend([f"Tabela adicionada: {t}" for t in added_tables])
-    report["removed"].extend([f"Tabela removida: {t}" for t in removed_tables])
-
-    # Tabelas existentes → checar colunas/medidas
-    for tname in set(old_tables) & set(new_tables):
-        old_t, new_t = old_tables[tname], new_tables[tname]
-
-        old_cols = {c["name"]: c for c in old_t.get("columns", [])}
-        new_cols = {c["name"]: c for c in new_t.get("columns", [])}
-
-        # Colunas adicionadas/retiradas
-        added_cols = set(new_cols) - set(old_cols)
-        removed_cols = set(old_cols) - set(new_cols)
-        report["added"].extend([f"Coluna adicionada em {tname}: {c}" for c in added_cols])
-        report["removed"].extend([f"Coluna removida em {tname}: {c}" for c in removed_cols])
+@st.cache_resource
+def obter_cache():
+    # Compartilhado entre reruns e sessões do mesmo processo
+    return CacheModelos()
 
-        # Colunas modificadas
-        for cname in set(old_cols) & set(new_cols):
-            old_c, new_c = old_cols[cname], new_cols[cname]
-            if old_c.get("description","") != new_c.get("description",""):
-                report["modified"].append({
-                    "tipo": "Coluna",
-                    "tabela": tname,
-                    "nome": cname,
-                    "alteracao_tipo": "descrição",
-                    "valor_antigo": old_c.get("description",""),
-                    "valor_novo": new_c.get("description","")
-                })
-            if old_c.get("dataType","") != new_c.get("dataType",""):
-                report["modified"].append({
-                    "tipo": "Coluna",
-                    "tabela": tname,
-                    "nome": cname,
-                    "alteracao_tipo": "tipo",
-                    "valor_antigo": old_c.get("dataType",""),
-                    "valor_novo": new_c.get("dataType","")
-                })
+def _exportar(funcao, comparacoes):
+    buffer = io.BytesIO()
+    funcao(buffer, comparacoes)
+    return buffer.getvalue()
 
-        # Medidas adicionadas/retiradas/modificadas
-        old_measures = {m["name"]: m for m in old_t.get("measures", [])}
-        new_measures = {m["name"]: m for m in new_t.get("measures", [])}
+cache = obter_cache()
 
-        added_measures = set(new_measures) - set(old_measures)
-        removed_measures = set(old_measures) - set(new_measures)
-        report["added"].extend([f"Medida adicionada em {tname}: {m}" for m in added_measures])
-        report["removed"].extend([f"Medida removida em {tname}: {m}" for m in removed_measures])
-
-        for mname in set(old_measures) & set(new_measures):
-            old_m, new_m = old_measures[mname], new_measures[mname]
-            if old_m.get("expression","") != new_m.get("expression",""):
-                report["modified"].append({
-                    "tipo": "Medida",
-                    "tabela": tname,
-                    "nome": mname,
-                    "alteracao_tipo": "DAX",
-                    "valor_antigo": old_m.get("expression",""),
-                    "valor_novo": new_m.get("expression","")
-                })
-            if old_m.get("description","") != new_m.get("description",""):
-                report["modified"].append({
-                    "tipo": "Medida",
-                    "tabela": tname,
-                    "nome": mname,
-                    "alteracao_tipo": "descrição",
-                    "valor_antigo": old_m.get("description",""),
-                    "valor_novo": new_m.get("description","")
-                })
-
-    return report
-
-# -----------------------------
-# Streamlit UI
-# -----------------------------
 st.title("📊 Versionamento e Auditoria de PBIT")
 
 # Uploads
@@ -103,41 +31,112 @@ pbit_file = st.file_uploader("📂 Carregue o PBIT Atual", type=["pbit"])
 previous_pbit_file = st.file_uploader("📂 Carregue o PBIT Anterior (para comparação)", type=["pbit"])
 
 if st.button("📌 Analisar"):
+    st.session_state.pop("relatorio", None)
     if pbit_file:
-        new_model = carregar_data_model(pbit_file)
+        new_model = cache.obter(pbit_file)
         if previous_pbit_file:
-            old_model = carregar_data_model(previous_pbit_file)
+            old_model = cache.obter(previous_pbit_file)
             report = comparar_modelos(old_model, new_model)
-
-            # -----------------------------
-            # Dashboard Resumido
-            # -----------------------------
-            st.subheader("📊 Resumo de Alterações")
-            df_summary = pd.DataFrame({
-                "Categoria": ["Adicionados", "Removidos", "Modificados"],
-                "Quantidade": [len(report["added"]), len(report["removed"]), len(report["modified"])]
-            })
-            chart = alt.Chart(df_summary).mark_bar().encode(
-                x=alt.X('Categoria', sort=None),
-                y='Quantidade',
-                color='Categoria'
-            ).properties(width=600, height=400, title="Resumo de Alterações no Modelo")
-            st.altair_chart(chart)
-
-            # -----------------------------
-            # Relatório Detalhado
-            # -----------------------------
-            st.subheader("🔍 Relatório de Alterações Detalhado")
-            st.write("### Adicionados")
-            st.write(report["added"] or "Nenhum")
-            st.write("### Removidos")
-            st.write(report["removed"] or "Nenhum")
-
-            st.write("### Modificados")
-            if report["modified"]:
-                df_mod = pd.DataFrame(report["modified"])
-                st.dataframe(df_mod, use_container_width=True)
-            else:
-                st.write("Nenhum")
+            # Montado uma vez; filtros e paginação só releem o que está na sessão
+            df_report = montar_dataframe(report)
+            st.session_state["relatorio"] = {
+                "df": df_report,
+                "resumo": resumo(df_report),
+                "comparacoes": [(previous_pbit_file.name, pbit_file.name, report)],
+                "impacto": montar_impacto(report),
+            }
         else:
             st.info("Nenhum PBIT anterior fornecido, apenas carregado o modelo atual.")
+        st.caption(
+            "Cache de modelos — memória: {acertos_memoria}, disco: {acertos_disco}, "
+            "carregados: {faltas}".format(**cache.estatisticas)
+        )
+
+if "relatorio" in st.session_state:
+    df_report = st.session_state["relatorio"]["df"]
+
+    # -----------------------------
+    # Dashboard Resumido
+    # -----------------------------
+    st.subheader("📊 Resumo de Alterações")
+    chart = alt.Chart(st.session_state["relatorio"]["resumo"]).mark_bar().encode(
+        x=alt.X('Categoria', sort=None),
+        y='Quantidade',
+        color='Categoria'
+    ).properties(width=600, height=400, title="Resumo de Alterações no Modelo")
+    st.altair_chart(chart)
+
+    # Arquivos gerados só quando o botão é clicado
+    comparacoes = st.session_state["relatorio"]["comparacoes"]
+    col1, col2, col3 = st.columns(3)
+    col1.download_button(
+        "⬇️ Exportar Excel",
+        data=lambda: _exportar(exportar_excel, comparacoes),
+        file_name="auditoria_pbit.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+    col2.download_button(
+        "⬇️ Exportar Parquet",
+        data=lambda: _exportar(exportar_parquet, comparacoes),
+        file_name="auditoria_pbit.parquet",
+        mime="application/vnd.apache.parquet",
+    )
+    col3.download_button(
+        "⬇️ Exportar Impacto (Parquet)",
+        data=lambda: _exportar(exportar_parquet_impacto, comparacoes),
+        file_name="auditoria_pbit_impacto.parquet",
+        mime="application/vnd.apache.parquet",
+    )
+
+    # -----------------------------
+    # Relatório Detalhado
+    # -----------------------------
+    st.subheader("🔍 Relatório de Alterações Detalhado")
+    if df_report.empty:
+        st.write("Nenhuma alteração")
+    else:
+        col1, col2, col3 = st.columns(3)
+        alteracoes = col1.multiselect("Alteração", CATEGORIAS)
+        tipos = col2.multiselect("Tipo", list(df_report["tipo"].cat.categories))
+        tabelas = col3.multiselect("Tabela", list(df_report["tabela"].cat.categories))
+        busca = st.text_input("Buscar por nome")
+        df_filtrado = filtrar(df_report, alteracoes, tipos, tabelas, busca)
+
+        col1, col2 = st.columns(2)
+        por_pagina = col1.selectbox("Linhas por página", [50, 100, 500, 1000])
+        paginas = max(1, -(-len(df_filtrado) // por_pagina))
+        pagina = col2.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, value=1)
+        inicio = (pagina - 1) * por_pagina
+        st.caption(f"{len(df_filtrado)} de {len(df_report)} alterações")
+        df_pagina = df_filtrado.iloc[inicio:inicio + por_pagina]
+        # A chave muda com página e filtros, então a seleção anterior é descartada
+        # em vez de apontar para outra linha (ou para fora) da página nova
+        chave_tabela = "tabela_relatorio|" + "|".join(
+            map(repr, (pagina, por_pagina, alteracoes, tipos, tabelas, busca))
+        )
+        evento = st.dataframe(df_pagina, use_container_width=True, on_select="rerun",
+                              selection_mode="single-row", key=chave_tabela)
+
+        # -----------------------------
+        # Diff do DAX da linha selecionada (calculado só sob demanda)
+        # -----------------------------
+        selecionadas = evento.selection.rows
+        if selecionadas and selecionadas[0] < len(df_pagina):
+            linha = df_pagina.iloc[selecionadas[0]]
+            if linha["campo"] == "DAX":
+                with st.expander(f"🧮 Diff do DAX — {linha['tabela']}[{linha['nome']}]", expanded=True):
+                    col1, col2 = st.columns(2)
+                    nivel = col1.radio("Nível", ["linhas", "tokens"], horizontal=True)
+                    normalizar = col2.checkbox("Ignorar espaços e comentários")
+                    ops = diff_expressoes(linha["valor_antigo"], linha["valor_novo"], nivel, normalizar)
+                    st.code(formatar_diff(ops, nivel), language="diff" if nivel == "linhas" else None)
+
+    # -----------------------------
+    # Impacto nas medidas
+    # -----------------------------
+    st.subheader("🧭 Impacto nas Medidas")
+    df_impacto = st.session_state["relatorio"]["impacto"]
+    if df_impacto.empty:
+        st.write("Nenhuma medida afetada")
+    else:
+        st.dataframe(df_impacto, use_container_width=True)